@@ -0,0 +1,42 @@
+"""
+Build the optional _haversine C extension in place.
+
+Usage:
+    python scripts/build_haversine.py
+
+Requires Cython and a C compiler. The app works without the extension;
+vet_locator simply falls back to its Numba/NumPy kernels.
+"""
+
+import sys
+from pathlib import Path
+
+try:
+    from Cython.Build import cythonize
+    from setuptools import Extension
+    from setuptools.dist import Distribution
+except ImportError as exc:
+    sys.exit(f"Cython and setuptools are required to build the extension: {exc}")
+
+
+def main():
+    root = Path(__file__).resolve().parent.parent
+
+    extension = Extension(
+        "src._haversine",
+        sources=[str(root / "src" / "_haversine.pyx")],
+        extra_compile_args=["-O3"],
+    )
+
+    dist = Distribution({
+        "ext_modules": cythonize([extension], language_level=3),
+    })
+    cmd = dist.get_command_obj("build_ext")
+    cmd.inplace = True
+    dist.run_command("build_ext")
+
+    print("Built src/_haversine extension in place.")
+
+
+if __name__ == "__main__":
+    main()
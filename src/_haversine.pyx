@@ -0,0 +1,55 @@
+# cython: boundscheck=False, wraparound=False, cdivision=True, language_level=3
+"""
+Optional C extension with the Haversine kernels.
+
+Build in place with scripts/build_haversine.py; vet_locator prefers
+these implementations when the compiled module is importable and falls
+back to the Numba/NumPy paths otherwise.
+"""
+
+from libc.math cimport sin, cos, asin, sqrt
+
+cdef double _R = 6371.0
+cdef double _DEG = 0.017453292519943295  # pi / 180
+
+
+cpdef double haversine_km(double lat1, double lon1,
+                          double lat2, double lon2) noexcept nogil:
+    """Great-circle distance in km between two points in degrees."""
+    cdef double lat1_rad = lat1 * _DEG
+    cdef double lat2_rad = lat2 * _DEG
+    cdef double sin_half_dlat = sin((lat2 - lat1) * _DEG / 2)
+    cdef double sin_half_dlon = sin((lon2 - lon1) * _DEG / 2)
+    cdef double a = (sin_half_dlat * sin_half_dlat +
+                     cos(lat1_rad) * cos(lat2_rad) *
+                     sin_half_dlon * sin_half_dlon)
+    if a > 1.0:
+        a = 1.0
+    return _R * 2 * asin(sqrt(a))
+
+
+cpdef void haversine_bulk(const float[::1] lat, const float[::1] lon,
+                          const float[::1] cos_lat,
+                          double lat1_rad, double lon1_rad,
+                          float[::1] out) noexcept nogil:
+    """
+    Distances in km from one query point to many hospitals.
+
+    Inputs are the float32 radian coordinate arrays plus the
+    precomputed per-hospital cos(lat); out must be preallocated with
+    the same length.
+    """
+    cdef Py_ssize_t i, n = lat.shape[0]
+    cdef float cos1 = <float>cos(lat1_rad)
+    cdef float lat1 = <float>lat1_rad
+    cdef float lon1 = <float>lon1_rad
+    cdef float sin_half_dlat, sin_half_dlon, a
+
+    for i in range(n):
+        sin_half_dlat = <float>sin((lat[i] - lat1) / 2)
+        sin_half_dlon = <float>sin((lon[i] - lon1) / 2)
+        a = (sin_half_dlat * sin_half_dlat +
+             cos1 * cos_lat[i] * sin_half_dlon * sin_half_dlon)
+        if a > 1.0:
+            a = 1.0
+        out[i] = <float>(_R * 2 * asin(sqrt(a)))
@@ -8,10 +8,63 @@ Author: PetMate Team
 Date: November 2025
 """
 
+import asyncio
 import json
+import os
+import re
+import sqlite3
 import time
-from typing import Dict, List, Optional
-from openai import OpenAI
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Note: openai is imported lazily inside the client properties so
+# mock-mode processes never pay its ~100ms import cost
+
+# orjson is much faster for cache (de)serialization; fall back to
+# stdlib json when it isn't installed
+try:
+    import orjson
+
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    def _json_loads(data):
+        return orjson.loads(data)
+except ImportError:
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+    def _json_loads(data):
+        return json.loads(data)
+
+# pyahocorasick matches every mock keyword in one pass over the text;
+# without it the per-category regex fallback is used
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+def _build_mock_automaton(categories) -> Optional[object]:
+    """
+    Build an Aho-Corasick automaton over all mock keywords.
+
+    Each keyword maps to (category index, payload); the lowest index
+    found in a scan wins, preserving category priority. Returns None
+    when pyahocorasick is not installed.
+    """
+    if ahocorasick is None:
+        return None
+
+    automaton = ahocorasick.Automaton()
+    for priority, (keywords, payload) in enumerate(categories):
+        for keyword in keywords:
+            # Keep the highest-priority payload if a keyword repeats
+            if not automaton.exists(keyword):
+                automaton.add_word(keyword, (priority, payload))
+    automaton.make_automaton()
+    return automaton
 
 # Support both direct execution and module import
 try:
@@ -19,22 +72,124 @@ try:
 except ModuleNotFoundError:
     from config import Config, get_api_settings, get_model_params
 
+# One shared HTTP connection pool for all OpenAI clients, so each new
+# analyzer (one per Streamlit session) reuses warm TLS connections
+# instead of paying a fresh handshake. Retries with backoff are
+# handled by the OpenAI SDK via the max_retries in get_api_settings().
+# If httpx isn't importable, the SDK falls back to per-client pools.
+try:
+    import atexit
+    import httpx
+
+    _HTTP_LIMITS = httpx.Limits(max_connections=32,
+                                max_keepalive_connections=16)
+    _http_client = httpx.Client(limits=_HTTP_LIMITS,
+                                timeout=Config.API_TIMEOUT)
+    atexit.register(_http_client.close)
+except ImportError:
+    httpx = None
+    _http_client = None
+
+_http_async_client = None
+
+
+def _get_async_http_client():
+    """Shared httpx.AsyncClient, created on first async API call."""
+    global _http_async_client
+    if httpx is not None and _http_async_client is None:
+        _http_async_client = httpx.AsyncClient(limits=_HTTP_LIMITS,
+                                               timeout=Config.API_TIMEOUT)
+    return _http_async_client
+
 
 class SymptomCache:
     """
-    Simple in-memory cache to avoid duplicate API calls.
+    LRU cache with TTL to avoid duplicate API calls.
+
+    Entries live in a single OrderedDict as (value, expiry) pairs, so
+    a hit costs one hash lookup, memory is bounded by MAX_ENTRIES,
+    and expired entries are evicted lazily. Results are also mirrored
+    to a small SQLite database so the cache survives process restarts
+    (Streamlit reruns would otherwise re-pay real API costs for
+    identical queries). Disk errors are swallowed: the disk layer is
+    an optimization, never a failure mode.
+
+    In-memory expiries use time.monotonic() so NTP wall-clock jumps
+    can't spuriously expire (or immortalize) entries; the disk layer
+    keeps wall-clock expiries since monotonic time has no meaning
+    across processes. Callers on a hot path can pass a shared `now`
+    to get/set to avoid repeated clock reads.
     """
 
+    # Cap memory for long-running Streamlit sessions
+    MAX_ENTRIES = 256
+
+    # Sweep expired entries every N sets so stale values don't linger
+    # until LRU eviction reaches them
+    SWEEP_INTERVAL = 64
+
+    # On-disk cache shared across processes and restarts; the
+    # PETMATE_CACHE_DB variable (and tests, via monkeypatch) can point
+    # it elsewhere so suites never touch the real home directory
+    DB_PATH = Path(os.environ.get(
+        "PETMATE_CACHE_DB", str(Path.home() / ".petmate" / "cache.db")))
+
     def __init__(self):
-        self.cache = {}
-        self.timestamps = {}
+        self._entries = OrderedDict()
+        self._sets_since_sweep = 0
+        self._db = None  # opened lazily on first use
+
+    def _get_db(self) -> sqlite3.Connection:
+        """Open (and initialize) the SQLite backing store lazily."""
+        if self._db is None:
+            self.DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.DB_PATH))
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(key TEXT PRIMARY KEY, value BLOB, expiry REAL)"
+            )
+            # Purge rows that expired while no process was running so
+            # the file stays bounded instead of growing forever
+            self._db.execute(
+                "DELETE FROM cache WHERE expiry<=?", (time.time(),))
+            self._db.commit()
+        return self._db
+
+    def _disk_get(self, key: str) -> Optional[tuple]:
+        """Look up an unexpired entry on disk. Returns (value, expiry)."""
+        try:
+            row = self._get_db().execute(
+                "SELECT value, expiry FROM cache WHERE key=? AND expiry>?",
+                (key, time.time())
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        return _json_loads(row[0]), row[1]
 
-    def get(self, key: str) -> Optional[Dict]:
+    def _disk_set(self, key: str, value: Dict, expiry: float):
+        """Mirror an entry to disk (best effort)."""
+        try:
+            db = self._get_db()
+            db.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expiry) "
+                "VALUES (?, ?, ?)",
+                (key, _json_dumps(value), expiry)
+            )
+            db.commit()
+        except sqlite3.Error:
+            pass
+
+    def get(self, key: str, now: float = None) -> Optional[Dict]:
         """
         Get cached result if not expired.
 
         Args:
             key: Cache key (symptom text)
+            now: Current time.monotonic() value, if the caller
+                 already has one
 
         Returns:
             Cached result or None
@@ -42,29 +197,77 @@ class SymptomCache:
         if not Config.ENABLE_CACHE:
             return None
 
-        if key in self.cache:
-            # Check if expired
-            age = time.time() - self.timestamps.get(key, 0)
-            if age < Config.CACHE_DURATION:
-                if Config.DEBUG_MODE:
-                    print(f"✅ Cache hit for: {key[:50]}...")
-                return self.cache[key]
+        if now is None:
+            now = time.monotonic()
+
+        entry = self._entries.get(key)
+        if entry is None:
+            # Fall back to the disk cache and promote hits to memory,
+            # converting its wall-clock expiry to a monotonic one
+            disk_entry = self._disk_get(key)
+            if disk_entry is None:
+                return None
+            value, wall_expiry = disk_entry
+            entry = (value, now + (wall_expiry - time.time()))
+            self._entries[key] = entry
+
+        value, expiry = entry
+        if now >= expiry:
+            del self._entries[key]
+            return None
 
-        return None
+        # Mark as most recently used
+        self._entries.move_to_end(key)
+        if Config.DEBUG_MODE:
+            print(f"✅ Cache hit for: {key[:50]}...")
+        return value
 
-    def set(self, key: str, value: Dict):
+    def set(self, key: str, value: Dict, now: float = None):
         """
-        Store result in cache.
+        Store result in cache, evicting LRU entries past MAX_ENTRIES.
 
         Args:
             key: Cache key
             value: Result to cache
+            now: Current time.monotonic() value, if the caller
+                 already has one
         """
-        if Config.ENABLE_CACHE:
-            self.cache[key] = value
-            self.timestamps[key] = time.time()
-            if Config.DEBUG_MODE:
-                print(f"💾 Cached result for: {key[:50]}...")
+        if not Config.ENABLE_CACHE:
+            return
+
+        if now is None:
+            now = time.monotonic()
+
+        self._entries[key] = (value, now + Config.CACHE_DURATION)
+        self._entries.move_to_end(key)
+        self._disk_set(key, value, time.time() + Config.CACHE_DURATION)
+
+        while len(self._entries) > self.MAX_ENTRIES:
+            self._entries.popitem(last=False)
+
+        self._sets_since_sweep += 1
+        if self._sets_since_sweep >= self.SWEEP_INTERVAL:
+            self._sweep()
+
+        if Config.DEBUG_MODE:
+            print(f"💾 Cached result for: {key[:50]}...")
+
+    def _sweep(self):
+        """Drop all expired entries (lazy periodic cleanup)."""
+        now = time.monotonic()
+        expired = [k for k, (_, expiry) in self._entries.items()
+                   if expiry <= now]
+        for key in expired:
+            del self._entries[key]
+        self._sets_since_sweep = 0
+
+        # Mirror the cleanup to disk (best effort, like _disk_set)
+        try:
+            db = self._get_db()
+            db.execute("DELETE FROM cache WHERE expiry<=?", (time.time(),))
+            db.commit()
+        except sqlite3.Error:
+            pass
 
 
 class AISymptomAnalyzer:
@@ -78,22 +281,77 @@ class AISymptomAnalyzer:
     - Cost-optimized prompts
     """
 
+    # Keyword -> condition dispatch table for mock mode. Order
+    # matters: the first matching category wins, mirroring the old
+    # elif cascade.
+    MOCK_KEYWORDS = [
+        (("vomit", "throw", "sick", "nausea", "stomach", "diarrhea"),
+         ("Digestive Upset",
+          "Possible gastric irritation or dietary issue", "moderate", False)),
+        (("limp", "leg", "pain", "walk", "lame"),
+         ("Leg Injury",
+          "Possible sprain, strain, or joint issue", "moderate", False)),
+        (("cough", "sneez", "breath", "wheez"),
+         ("Respiratory Issue",
+          "Possible upper respiratory infection", "mild", False)),
+        (("scratch", "itch", "skin", "rash", "fur", "hair loss"),
+         ("Skin Irritation",
+          "Possible allergic reaction or parasite", "mild", False)),
+        (("eye", "squint", "discharge", "red eye"),
+         ("Eye Problem",
+          "Eye infection, injury, or irritation", "moderate", False)),
+        (("ear", "head shak", "tilt"),
+         ("Ear Problem",
+          "Ear infection or mite infestation", "mild", False)),
+        (("tired", "sleep", "energy", "weak", "lethar", "depress"),
+         ("Lethargy",
+          "Unusual tiredness or lack of energy", "moderate", False)),
+        (("eat", "food", "appetite", "hungry"),
+         ("Loss of Appetite",
+          "Decreased or absent appetite", "moderate", False)),
+    ]
+
+    # Regex fallback path: one compiled alternation per category
+    MOCK_CATEGORIES = [
+        (re.compile("|".join(map(re.escape, keywords)), re.IGNORECASE), payload)
+        for keywords, payload in MOCK_KEYWORDS
+    ]
+
+    MOCK_DEFAULT = ("General Health Concern",
+                    "Symptoms require veterinary evaluation", "moderate", False)
+
+    # Single-pass matcher over all keywords (None without pyahocorasick)
+    MOCK_AUTOMATON = _build_mock_automaton(MOCK_KEYWORDS)
+
     def __init__(self):
-        """Initialize the analyzer with OpenAI client and cache."""
+        """Initialize the analyzer with cache and lazy OpenAI clients."""
         self.cache = SymptomCache()
-        self.client = None
-
-        # Initialize OpenAI client only if not in mock mode
-        if not Config.USE_MOCK_AI:
-            if not Config.OPENAI_API_KEY:
-                raise ValueError("OPENAI_API_KEY is required when USE_MOCK_AI=False")
+        self._client = None
+        self._async_client = None
 
-            self.client = OpenAI(**get_api_settings())
+        # Real mode still requires a key up front, but the client
+        # itself (TLS setup, connection pool) is deferred to the
+        # first actual API call so cache-hit-only sessions never pay
+        # for it
+        if not Config.USE_MOCK_AI and not Config.OPENAI_API_KEY:
+            raise ValueError("OPENAI_API_KEY is required when USE_MOCK_AI=False")
 
         # Track API usage for cost monitoring
         self.api_calls = 0
         self.total_tokens = 0
 
+    @property
+    def client(self):
+        """Sync OpenAI client, created on first real API call."""
+        if self._client is None:
+            from openai import OpenAI
+            settings = dict(get_api_settings())
+            if _http_client is not None:
+                # Share one connection pool across all instances
+                settings["http_client"] = _http_client
+            self._client = OpenAI(**settings)
+        return self._client
+
     def analyze_symptoms(
             self,
             symptom_text: str,
@@ -117,89 +375,116 @@ class AISymptomAnalyzer:
                 "urgent": bool
             }
         """
-        # Input validation
-        if not symptom_text or not symptom_text.strip():
+        # Normalize once: the lowered text doubles as the cache-key
+        # body and the mock-matching input (no second .lower() pass)
+        normalized = symptom_text.lower().strip() if symptom_text else ""
+        if not normalized:
             raise ValueError("Symptom text cannot be empty")
 
-        # Check cache first
-        cache_key = f"{pet_type}:{symptom_text.lower().strip()}"
-        cached_result = self.cache.get(cache_key)
+        # Check cache first (one clock read shared by get and set).
+        # The key carries the analysis mode: the disk cache outlives
+        # the process, so mock results must never answer real-API
+        # queries (or vice versa)
+        now = time.monotonic()
+        mode = "mock" if Config.USE_MOCK_AI else "real"
+        cache_key = mode + ':' + pet_type + ':' + normalized
+        cached_result = self.cache.get(cache_key, now=now)
         if cached_result:
             return cached_result
 
         # Use mock or real API based on config
         if Config.USE_MOCK_AI:
-            result = self._mock_analyze(symptom_text, pet_type)
+            result = self._mock_analyze(normalized, pet_type)
         else:
             result = self._real_analyze(symptom_text, pet_type)
 
         # Cache the result
-        self.cache.set(cache_key, result)
+        self.cache.set(cache_key, result, now=now)
 
         return result
 
+    async def analyze_symptoms_batch(
+            self,
+            items: List[Tuple[str, str]]
+    ) -> List[Dict]:
+        """
+        Analyze several (symptom_text, pet_type) pairs concurrently.
+
+        In real-API mode all cache misses are issued as concurrent
+        requests through AsyncOpenAI, so N queries cost roughly one
+        network round trip instead of N sequential ones. Cache hits
+        and mock-mode results are served inline.
+
+        Args:
+            items: List of (symptom_text, pet_type) tuples
+
+        Returns:
+            List of analysis result dictionaries, in input order
+        """
+        results: List[Optional[Dict]] = [None] * len(items)
+        pending = []  # (index, cache_key, symptom_text, pet_type)
+        # Same mode-qualified keys as analyze_symptoms
+        mode = "mock" if Config.USE_MOCK_AI else "real"
+
+        for i, (symptom_text, pet_type) in enumerate(items):
+            normalized = symptom_text.lower().strip() if symptom_text else ""
+            if not normalized:
+                raise ValueError("Symptom text cannot be empty")
+
+            cache_key = mode + ':' + pet_type + ':' + normalized
+            cached_result = self.cache.get(cache_key)
+            if cached_result:
+                results[i] = cached_result
+            elif Config.USE_MOCK_AI:
+                result = self._mock_analyze(normalized, pet_type)
+                self.cache.set(cache_key, result)
+                results[i] = result
+            else:
+                pending.append((i, cache_key, symptom_text, pet_type))
+
+        if pending:
+            responses = await asyncio.gather(
+                *(self._real_analyze_async(text, pet)
+                  for _, _, text, pet in pending),
+                return_exceptions=True
+            )
+
+            for (i, cache_key, text, pet), result in zip(pending, responses):
+                if isinstance(result, Exception):
+                    print(f"❌ API Error: {result}")
+                    print("⚠️  Falling back to mock analysis")
+                    result = self._mock_analyze(text.lower(), pet)
+                self.cache.set(cache_key, result)
+                results[i] = result
+
+        return results
+
     def _mock_analyze(self, symptom_text: str, pet_type: str) -> Dict:
         """
         Mock analysis for development (no API cost).
 
-        Returns realistic-looking results based on keywords.
+        Expects already-lowercased text (analyze_symptoms normalizes
+        once). With pyahocorasick installed, all keywords are matched
+        in one pass over the text; otherwise the precompiled
+        MOCK_CATEGORIES regexes are scanned per category.
         """
-        text_lower = symptom_text.lower()
-
-        # Simple keyword matching for mock
-        # Check for digestive issues
-        if any(word in text_lower for word in ["vomit", "throw", "sick", "nausea", "stomach", "diarrhea"]):
-            condition = "Digestive Upset"
-            description = "Possible gastric irritation or dietary issue"
-            severity = "moderate"
-            urgent = False
-        # Check for leg/mobility issues
-        elif any(word in text_lower for word in ["limp", "leg", "pain", "walk", "lame"]):
-            condition = "Leg Injury"
-            description = "Possible sprain, strain, or joint issue"
-            severity = "moderate"
-            urgent = False
-        # Check for respiratory issues
-        elif any(word in text_lower for word in ["cough", "sneez", "breath", "wheez"]):
-            condition = "Respiratory Issue"
-            description = "Possible upper respiratory infection"
-            severity = "mild"
-            urgent = False
-        # Check for skin issues
-        elif any(word in text_lower for word in ["scratch", "itch", "skin", "rash", "fur", "hair loss"]):
-            condition = "Skin Irritation"
-            description = "Possible allergic reaction or parasite"
-            severity = "mild"
-            urgent = False
-        # Check for eye issues
-        elif any(word in text_lower for word in ["eye", "squint", "discharge", "red eye"]):
-            condition = "Eye Problem"
-            description = "Eye infection, injury, or irritation"
-            severity = "moderate"
-            urgent = False
-        # Check for ear issues
-        elif any(word in text_lower for word in ["ear", "head shak", "tilt"]):
-            condition = "Ear Problem"
-            description = "Ear infection or mite infestation"
-            severity = "mild"
-            urgent = False
-        # Check for lethargy
-        elif any(word in text_lower for word in ["tired", "sleep", "energy", "weak", "lethar", "depress"]):
-            condition = "Lethargy"
-            description = "Unusual tiredness or lack of energy"
-            severity = "moderate"
-            urgent = False
-        # Check for appetite issues
-        elif any(word in text_lower for word in ["eat", "food", "appetite", "hungry"]):
-            condition = "Loss of Appetite"
-            description = "Decreased or absent appetite"
-            severity = "moderate"
-            urgent = False
+        if self.MOCK_AUTOMATON is not None:
+            # Lowest category index wins, preserving cascade priority
+            best_priority = len(self.MOCK_KEYWORDS)
+            payload = self.MOCK_DEFAULT
+            for _, (priority, category_payload) in \
+                    self.MOCK_AUTOMATON.iter(symptom_text):
+                if priority < best_priority:
+                    best_priority = priority
+                    payload = category_payload
+            condition, description, severity, urgent = payload
         else:
-            condition = "General Health Concern"
-            description = "Symptoms require veterinary evaluation"
-            severity = "moderate"
-            urgent = False
+            for pattern, payload in self.MOCK_CATEGORIES:
+                if pattern.search(symptom_text):
+                    condition, description, severity, urgent = payload
+                    break
+            else:
+                condition, description, severity, urgent = self.MOCK_DEFAULT
 
         if Config.DEBUG_MODE:
             print(f"🤖 Mock analysis for: {symptom_text[:50]}...")
@@ -252,9 +537,54 @@ class AISymptomAnalyzer:
 
         except Exception as e:
             print(f"❌ API Error: {e}")
-            # Fallback to mock on error
+            # Fallback to mock on error (mock expects lowered text)
             print("⚠️  Falling back to mock analysis")
-            return self._mock_analyze(symptom_text, pet_type)
+            return self._mock_analyze(symptom_text.lower(), pet_type)
+
+    @property
+    def async_client(self):
+        """Async OpenAI client, created on first use and reused."""
+        if self._async_client is None:
+            from openai import AsyncOpenAI
+            settings = dict(get_api_settings())
+            shared_http = _get_async_http_client()
+            if shared_http is not None:
+                # Share one connection pool across all instances
+                settings["http_client"] = shared_http
+            self._async_client = AsyncOpenAI(**settings)
+        return self._async_client
+
+    async def _real_analyze_async(self, symptom_text: str, pet_type: str) -> Dict:
+        """
+        Async variant of _real_analyze used by analyze_symptoms_batch.
+
+        Errors propagate to the caller, which falls back to mock
+        analysis per item.
+        """
+        system_prompt = self._build_system_prompt()
+        user_prompt = self._build_user_prompt(symptom_text, pet_type)
+
+        response = await self.async_client.chat.completions.create(
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            **get_model_params()
+        )
+
+        # Track usage
+        self.api_calls += 1
+        tokens_used = response.usage.total_tokens
+        self.total_tokens += tokens_used
+
+        if Config.LOG_API_USAGE:
+            cost = tokens_used * 0.000002  # Approximate cost
+            print(f"💰 API Call #{self.api_calls}: {tokens_used} tokens (~${cost:.6f})")
+
+        result = self._parse_ai_response(response.choices[0].message.content, pet_type)
+        result["mode"] = "real_api"
+
+        return result
 
     def _build_system_prompt(self) -> str:
         """
@@ -279,8 +609,9 @@ class AISymptomAnalyzer:
         Handles both JSON and plain text responses.
         """
         try:
-            # Try to parse as JSON
-            data = json.loads(content)
+            # Try to parse as JSON (orjson when available, see top of
+            # module; its JSONDecodeError is a ValueError too)
+            data = _json_loads(content)
 
             return {
                 "condition_name": data.get("condition", "Unknown"),
@@ -291,10 +622,8 @@ class AISymptomAnalyzer:
                 "urgent": data.get("urgent", False)
             }
 
-        except json.JSONDecodeError:
-            # Fallback: parse plain text
-            lines = content.strip().split('\n')
-
+        except ValueError:
+            # Fallback: treat as plain text
             return {
                 "condition_name": "AI Analysis",
                 "confidence": 0.8,
@@ -321,7 +650,11 @@ class AISymptomAnalyzer:
         }
 
 
-# Convenience function
+# Shared analyzer for the convenience function, so repeated calls
+# reuse the in-memory cache instead of discarding it each time
+_default_analyzer = None
+
+
 def analyze_pet_symptoms(symptom_text: str, pet_type: str = "dog") -> Dict:
     """
     Quick function to analyze symptoms.
@@ -333,8 +666,10 @@ def analyze_pet_symptoms(symptom_text: str, pet_type: str = "dog") -> Dict:
     Returns:
         Analysis results dictionary
     """
-    analyzer = AISymptomAnalyzer()
-    return analyzer.analyze_symptoms(symptom_text, pet_type)
+    global _default_analyzer
+    if _default_analyzer is None:
+        _default_analyzer = AISymptomAnalyzer()
+    return _default_analyzer.analyze_symptoms(symptom_text, pet_type)
 
 
 # Testing
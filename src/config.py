@@ -9,98 +9,118 @@ Date: November 2025
 """
 
 import os
+from dataclasses import dataclass
+from functools import cache
+from typing import Optional
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
 
-class Config:
-    """
-    Configuration class to manage all application settings.
-
-    This centralizes configuration management and provides easy access
-    to environment variables throughout the application.
-    """
-
-    # ============================================
-    # OpenAI API Configuration
-    # ============================================
-
-    OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-    OPENAI_ORG_ID = os.getenv("OPENAI_ORG_ID")
-
-    # ============================================
-    # Cost-Saving Settings
-    # ============================================
-
-    # Mock mode: Use fake responses instead of real API calls
-    USE_MOCK_AI = os.getenv("USE_MOCK_AI", "True").lower() == "true"
-
-    # Enable caching to avoid duplicate API calls
-    ENABLE_CACHE = os.getenv("ENABLE_CACHE", "True").lower() == "true"
-
-    # Cache duration in seconds
-    CACHE_DURATION = int(os.getenv("CACHE_DURATION", "3600"))
-
-    # ============================================
-    # Model Configuration (Optimized for Cost)
-    # ============================================
-
-    # Model name (gpt-3.5-turbo is cheapest)
-    OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+def _env_bool(name: str, default: str) -> bool:
+    """Parse a boolean environment variable."""
+    return os.getenv(name, default).lower() == "true"
 
-    # Maximum tokens per response (lower = cheaper)
-    OPENAI_MAX_TOKENS = int(os.getenv("OPENAI_MAX_TOKENS", "150"))
 
-    # Temperature (lower = more deterministic and shorter)
-    OPENAI_TEMPERATURE = float(os.getenv("OPENAI_TEMPERATURE", "0.3"))
-
-    # ============================================
-    # API Settings
-    # ============================================
+def _load_env() -> dict:
+    """
+    Read and parse all configuration keys from the environment.
 
-    API_TIMEOUT = int(os.getenv("API_TIMEOUT", "10"))
-    API_RETRY_ATTEMPTS = int(os.getenv("API_RETRY_ATTEMPTS", "2"))
-    API_RETRY_DELAY = int(os.getenv("API_RETRY_DELAY", "1"))
+    Called exactly once when the module-level Config instance is
+    built, so no getenv/parse work happens on hot paths.
+    """
+    return {
+        # OpenAI API configuration
+        "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY"),
+        "OPENAI_ORG_ID": os.getenv("OPENAI_ORG_ID"),
+
+        # Cost-saving settings
+        "USE_MOCK_AI": _env_bool("USE_MOCK_AI", "True"),
+        "ENABLE_CACHE": _env_bool("ENABLE_CACHE", "True"),
+        "CACHE_DURATION": int(os.getenv("CACHE_DURATION", "3600")),
+
+        # Model configuration (optimized for cost)
+        "OPENAI_MODEL": os.getenv("OPENAI_MODEL", "gpt-3.5-turbo"),
+        "OPENAI_MAX_TOKENS": int(os.getenv("OPENAI_MAX_TOKENS", "150")),
+        "OPENAI_TEMPERATURE": float(os.getenv("OPENAI_TEMPERATURE", "0.3")),
+
+        # API settings
+        "API_TIMEOUT": int(os.getenv("API_TIMEOUT", "10")),
+        "API_RETRY_ATTEMPTS": int(os.getenv("API_RETRY_ATTEMPTS", "2")),
+        "API_RETRY_DELAY": int(os.getenv("API_RETRY_DELAY", "1")),
+
+        # Application settings
+        "DEBUG_MODE": _env_bool("DEBUG_MODE", "False"),
+        "LOG_API_USAGE": _env_bool("LOG_API_USAGE", "True"),
+    }
 
-    # ============================================
-    # Application Settings
-    # ============================================
 
-    DEBUG_MODE = os.getenv("DEBUG_MODE", "False").lower() == "true"
-    LOG_API_USAGE = os.getenv("LOG_API_USAGE", "True").lower() == "true"
+@dataclass(frozen=True)
+class _Config:
+    """
+    Frozen application settings, parsed from the environment once.
 
-    # ============================================
-    # Validation
-    # ============================================
+    frozen=True makes the parsed values immutable and __slots__ keeps
+    the instance small, so hot paths can read attributes (or capture
+    them in locals) without re-parsing anything.
+    """
 
-    @classmethod
-    def validate(cls):
+    __slots__ = (
+        "OPENAI_API_KEY", "OPENAI_ORG_ID",
+        "USE_MOCK_AI", "ENABLE_CACHE", "CACHE_DURATION",
+        "OPENAI_MODEL", "OPENAI_MAX_TOKENS", "OPENAI_TEMPERATURE",
+        "API_TIMEOUT", "API_RETRY_ATTEMPTS", "API_RETRY_DELAY",
+        "DEBUG_MODE", "LOG_API_USAGE",
+    )
+
+    # OpenAI API configuration
+    OPENAI_API_KEY: Optional[str]
+    OPENAI_ORG_ID: Optional[str]
+
+    # Cost-saving settings (mock mode avoids real API calls entirely)
+    USE_MOCK_AI: bool
+    ENABLE_CACHE: bool
+    CACHE_DURATION: int
+
+    # Model configuration (gpt-3.5-turbo is cheapest; lower tokens and
+    # temperature keep responses short and deterministic)
+    OPENAI_MODEL: str
+    OPENAI_MAX_TOKENS: int
+    OPENAI_TEMPERATURE: float
+
+    # API settings
+    API_TIMEOUT: int
+    API_RETRY_ATTEMPTS: int
+    API_RETRY_DELAY: int
+
+    # Application settings
+    DEBUG_MODE: bool
+    LOG_API_USAGE: bool
+
+    def validate(self):
         """
         Validate that all required configuration is present.
 
         Raises:
             ValueError: If required configuration is missing
         """
-        if not cls.USE_MOCK_AI and not cls.OPENAI_API_KEY:
+        if not self.USE_MOCK_AI and not self.OPENAI_API_KEY:
             raise ValueError(
                 "OPENAI_API_KEY is required when USE_MOCK_AI=False. "
                 "Please set it in your .env file."
             )
 
-    @classmethod
-    def get_mode(cls):
+    def get_mode(self):
         """
         Get current operation mode.
 
         Returns:
             str: 'DEVELOPMENT' or 'PRODUCTION'
         """
-        return "DEVELOPMENT (Mock)" if cls.USE_MOCK_AI else "PRODUCTION (Real API)"
+        return "DEVELOPMENT (Mock)" if self.USE_MOCK_AI else "PRODUCTION (Real API)"
 
-    @classmethod
-    def get_cost_info(cls):
+    def get_cost_info(self):
         """
         Get information about current cost-saving settings.
 
@@ -108,32 +128,34 @@ class Config:
             dict: Cost-saving configuration details
         """
         return {
-            "mode": cls.get_mode(),
-            "use_mock": cls.USE_MOCK_AI,
-            "cache_enabled": cls.ENABLE_CACHE,
-            "max_tokens": cls.OPENAI_MAX_TOKENS,
-            "temperature": cls.OPENAI_TEMPERATURE,
-            "estimated_cost_per_call": "$0.0002" if not cls.USE_MOCK_AI else "$0",
+            "mode": self.get_mode(),
+            "use_mock": self.USE_MOCK_AI,
+            "cache_enabled": self.ENABLE_CACHE,
+            "max_tokens": self.OPENAI_MAX_TOKENS,
+            "temperature": self.OPENAI_TEMPERATURE,
+            "estimated_cost_per_call": "$0.0002" if not self.USE_MOCK_AI else "$0",
         }
 
-    @classmethod
-    def print_config(cls):
+    def print_config(self):
         """Print current configuration (for debugging)."""
         print("=" * 50)
         print("PetMate Configuration")
         print("=" * 50)
-        print(f"Mode: {cls.get_mode()}")
-        print(f"Use Mock AI: {cls.USE_MOCK_AI}")
-        print(f"Cache Enabled: {cls.ENABLE_CACHE}")
-        print(f"Model: {cls.OPENAI_MODEL}")
-        print(f"Max Tokens: {cls.OPENAI_MAX_TOKENS}")
-        print(f"Temperature: {cls.OPENAI_TEMPERATURE}")
-        print(f"Debug Mode: {cls.DEBUG_MODE}")
-        print(f"API Key Present: {'Yes' if cls.OPENAI_API_KEY else 'No'}")
+        print(f"Mode: {self.get_mode()}")
+        print(f"Use Mock AI: {self.USE_MOCK_AI}")
+        print(f"Cache Enabled: {self.ENABLE_CACHE}")
+        print(f"Model: {self.OPENAI_MODEL}")
+        print(f"Max Tokens: {self.OPENAI_MAX_TOKENS}")
+        print(f"Temperature: {self.OPENAI_TEMPERATURE}")
+        print(f"Debug Mode: {self.DEBUG_MODE}")
+        print(f"API Key Present: {'Yes' if self.OPENAI_API_KEY else 'No'}")
         print("=" * 50)
 
 
-# Validate configuration on import
+# Single shared instance; environment parsing happens exactly once here
+Config = _Config(**_load_env())
+
+# Validate configuration on load
 Config.validate()
 
 
@@ -148,10 +170,14 @@ def is_cache_enabled():
     return Config.ENABLE_CACHE
 
 
+@cache
 def get_api_settings():
     """
     Get OpenAI API settings.
 
+    Cached: returns the same dict object on every call instead of
+    rebuilding it (Config is frozen, so the values cannot drift).
+
     Returns:
         dict: API configuration for OpenAI client
     """
@@ -162,10 +188,14 @@ def get_api_settings():
     }
 
 
+@cache
 def get_model_params():
     """
     Get model parameters for API calls.
 
+    Cached: returns the same dict object on every call instead of
+    rebuilding it (Config is frozen, so the values cannot drift).
+
     Returns:
         dict: Model parameters optimized for cost
     """
@@ -181,4 +211,4 @@ if __name__ == "__main__":
     Config.print_config()
     print("\nCost Info:")
     for key, value in Config.get_cost_info().items():
-        print(f"  {key}: {value}")
\ No newline at end of file
+        print(f"  {key}: {value}")
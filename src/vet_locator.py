@@ -4,15 +4,102 @@ Veterinary Hospital Locator for PetMate
 This module provides functionality to find and recommend nearby veterinary
 hospitals based on user location, ratings, and other criteria.
 
+Data layout: the hot path (radius search, filtering, ranking) runs
+entirely on structure-of-arrays NumPy columns (_lat, _ratings,
+_specialty_bits, ...) built once at load time. The original hospital
+dicts are kept only as presentation records, materialized per row on
+demand; they never carry per-query state, so a slotted record class
+would not change the working set of any query.
+
 Author: PetMate Team
 Date: November 2025
 """
 
+import functools
 import json
 import math
+import mmap
+from collections import OrderedDict
+from collections.abc import Sequence
 from typing import List, Dict, Tuple, Optional
 from pathlib import Path
 
+import numpy as np
+
+# Optional fast JSON parser; stdlib json is the fallback
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on environment
+    orjson = None
+
+# Optional spatial index; brute-force vectorized scan is the fallback
+try:
+    from sklearn.neighbors import BallTree
+except ImportError:  # pragma: no cover - depends on environment
+    BallTree = None
+
+# Optional JIT compiler for the scalar kernel; plain Python fallback
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - depends on environment
+    njit = None
+
+# Optional compiled Haversine kernels (built with
+# scripts/build_haversine.py); Numba/NumPy paths are the fallback
+try:
+    from src import _haversine as _chaversine
+except ImportError:  # pragma: no cover - depends on environment
+    try:
+        import _haversine as _chaversine
+    except ImportError:
+        _chaversine = None
+
+# Optional vectorized geometry backend (Shapely 2.x) for polygon queries
+try:
+    import shapely
+    if not hasattr(shapely, "points"):  # Shapely 1.x lacks the array API
+        shapely = None
+except ImportError:  # pragma: no cover - depends on environment
+    shapely = None
+
+
+# Earth's mean radius in km, folded into the kernels as a module
+# constant (no attribute lookups on the hot path). Defined before the
+# scalar kernel below, which reads it at import time when Numba
+# compiles the warm-up call.
+_R = 6371.0
+
+
+def _haversine_km(lat1: float, lon1: float,
+                  lat2: float, lon2: float) -> float:
+    """
+    Great-circle distance in kilometers between two points in degrees.
+
+    Returns the raw, unrounded distance; rounding is a display concern
+    handled by calculate_distance and the materialized result dicts.
+    Pure-numeric module-level kernel so Numba can JIT-compile it when
+    available (decorated below); the math is identical either way.
+    """
+    lat1_rad = math.radians(lat1)
+    lat2_rad = math.radians(lat2)
+    delta_lat = math.radians(lat2 - lat1)
+    delta_lon = math.radians(lon2 - lon1)
+
+    a = (math.sin(delta_lat / 2) ** 2 +
+         math.cos(lat1_rad) * math.cos(lat2_rad) *
+         math.sin(delta_lon / 2) ** 2)
+
+    return _R * 2 * math.asin(math.sqrt(a))
+
+
+if _chaversine is not None:  # pragma: no cover - depends on environment
+    _haversine_km = _chaversine.haversine_km
+elif njit is not None:  # pragma: no cover - depends on environment
+    _haversine_km = njit(cache=True, fastmath=True)(_haversine_km)
+    # Trigger compilation at import (cache=True persists it across
+    # processes) so the first real query never pays the JIT latency
+    _haversine_km(0.0, 0.0, 0.0, 0.0)
+
 # Support both direct execution and module import
 try:
     from src.config import Config
@@ -20,6 +107,224 @@ except ModuleNotFoundError:
     from config import Config
 
 
+# Grid-hash cell size in degrees (~5.5 km of latitude per cell), sized
+# so a short-radius query touches only a small block of cells
+_GRID_CELL_DEG = 0.05
+
+# Specialty bitmask layout for the _specialty_bits array
+_BIT_CANINE = 0b001
+_BIT_FELINE = 0b010
+_BIT_GENERAL = 0b100
+
+# pet_type -> acceptable-specialty bitmask, resolved with one dict
+# lookup per query instead of chained string comparisons; unknown pet
+# types map to None (no filtering), as before
+_PET_MASKS = {
+    "dog": _BIT_CANINE | _BIT_GENERAL,
+    "cat": _BIT_FELINE | _BIT_GENERAL,
+}
+
+
+# Array names persisted in the on-disk .npz cache, in tuple order
+_NPZ_FIELDS = ("lat_deg", "lon_deg", "lat", "lon", "cos_lat",
+               "ratings", "is_emergency", "specialty_bits")
+
+
+def _load_array_cache(cache_path: Path, mtime_ns: int, n: int):
+    """
+    Load the precomputed arrays from the .npz next to the JSON DB.
+
+    Returns the field dict, or None when the cache is missing, older
+    than the JSON, or inconsistent with it (wrong row count, missing
+    fields, unreadable).
+    """
+    try:
+        if (not cache_path.exists() or
+                cache_path.stat().st_mtime_ns < mtime_ns):
+            return None
+        with np.load(cache_path) as archive:
+            arrays = {name: archive[name] for name in _NPZ_FIELDS}
+    except (OSError, KeyError, ValueError):
+        return None
+
+    if len(arrays["lat"]) != n:
+        return None
+    return arrays
+
+
+def _save_array_cache(cache_path: Path, arrays: dict):
+    """Best-effort write of the array cache; failures are ignored."""
+    try:
+        np.savez(cache_path, **arrays)
+    except OSError:
+        pass
+
+
+@functools.lru_cache(maxsize=8)
+def _load_db(db_path: str, mtime_ns: int):
+    """
+    Load and parse a hospital database, with the precomputed SoA arrays.
+
+    Cached per (absolute path, mtime) so constructing many VetLocator
+    instances (e.g. one per find_nearby_vets call) parses the JSON and
+    builds the arrays once per process; editing the file on disk busts
+    the cache via the mtime key.
+
+    Returns:
+        Tuple of (hospitals, lat, lon, ratings, is_emergency,
+        specialty_bits, tree, cos_lat, lat_deg, lon_deg, geoms, rtree,
+        grid): hospitals is an immutable tuple of dicts; lat/lon/
+        cos_lat are float32 radian (and cosine) arrays and lat_deg/
+        lon_deg their float64 degree sources; ratings, is_emergency and
+        specialty_bits are the filter columns; tree is the optional
+        BallTree, geoms/rtree the optional Shapely point array and
+        STRtree, and grid the fixed-cell spatial hash. Optional members
+        are None when their backing package is unavailable.
+    """
+    # Memory-map the file so the parser reads straight from the page
+    # cache without an intermediate bytes copy; zero-length or otherwise
+    # unmappable files fall back to a plain read
+    with open(db_path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            raw = f.read()
+            data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        else:
+            try:
+                if orjson is not None:
+                    data = orjson.loads(memoryview(mm))
+                else:
+                    data = json.loads(mm[:])
+            finally:
+                mm.close()
+
+    hospitals = tuple(data.get("hospitals", []))
+
+    # Lowercased specialty sets, computed once per load for the bitmask
+    # build below. Kept out of the hospital dicts: those are copied into
+    # public results, which must stay plain JSON-serializable records.
+    specialty_sets = [frozenset(s.lower() for s in h.get("specialties", []))
+                      for h in hospitals]
+
+    # Derived numeric arrays persist in a .npz next to the JSON, keyed
+    # by mtime, so cold starts skip rebuilding them
+    cache_path = Path(db_path).with_suffix(".cache.npz")
+    arrays = _load_array_cache(cache_path, mtime_ns, len(hospitals))
+
+    if arrays is None:
+        lat_deg = np.array(
+            [h["latitude"] for h in hospitals], dtype=np.float64)
+        lon_deg = np.array(
+            [h["longitude"] for h in hospitals], dtype=np.float64)
+        lat64 = np.deg2rad(lat_deg)
+        # float32 is ~11 cm of coordinate precision - far beyond what a
+        # hospital address needs - and halves the bytes streamed per query
+        arrays = {
+            "lat_deg": lat_deg,
+            "lon_deg": lon_deg,
+            "lat": lat64.astype(np.float32),
+            "lon": np.deg2rad(lon_deg).astype(np.float32),
+            # Hospital latitudes never change between queries, so their
+            # trig is paid once here; the bulk kernel reuses these as
+            # plain loads
+            "cos_lat": np.cos(lat64).astype(np.float32),
+            "ratings": np.array(
+                [h["rating"] for h in hospitals], dtype=np.float32),
+            "is_emergency": np.array(
+                [h.get("is_emergency", False) for h in hospitals],
+                dtype=bool),
+            "specialty_bits": np.array(
+                [(_BIT_CANINE * ("canine" in s)) |
+                 (_BIT_FELINE * ("feline" in s)) |
+                 (_BIT_GENERAL * ("general" in s))
+                 for s in specialty_sets], dtype=np.uint8),
+        }
+        _save_array_cache(cache_path, arrays)
+
+    lat_deg = arrays["lat_deg"]
+    lon_deg = arrays["lon_deg"]
+    lat = arrays["lat"]
+    lon = arrays["lon"]
+    cos_lat = arrays["cos_lat"]
+    ratings = arrays["ratings"]
+    is_emergency = arrays["is_emergency"]
+    specialty_bits = arrays["specialty_bits"]
+
+    # Haversine is a proper metric, so a BallTree over the radian
+    # coordinates answers great-circle radius queries with pruning
+    # instead of a full scan. The tree keeps its own float64 copy; it
+    # is rebuilt per load rather than pickled (cheap at this scale)
+    if BallTree is not None and len(hospitals) > 0:
+        tree = BallTree(
+            np.column_stack([np.deg2rad(lat_deg), np.deg2rad(lon_deg)]),
+            metric="haversine")
+    else:
+        tree = None
+
+    # Geometry array + STRtree for vectorized polygon predicates
+    if shapely is not None and len(hospitals) > 0:
+        geoms = shapely.points(lon_deg, lat_deg)
+        rtree = shapely.STRtree(geoms)
+    else:
+        geoms = None
+        rtree = None
+
+    # Fixed grid hash over degree cells: short-radius queries on the
+    # brute path gather a handful of cells in O(1) instead of masking
+    # the whole table. floor (not int()) keeps negative coordinates in
+    # the right cell.
+    grid = {}
+    n_lon = round(360 / _GRID_CELL_DEG)
+    for i in range(len(hospitals)):
+        cx = math.floor(lon_deg[i] / _GRID_CELL_DEG)
+        key = (math.floor(lat_deg[i] / _GRID_CELL_DEG),
+               (cx + n_lon // 2) % n_lon - n_lon // 2)
+        grid.setdefault(key, []).append(i)
+    grid = {k: np.array(v, dtype=np.intp) for k, v in grid.items()}
+
+    return (hospitals, lat, lon, ratings, is_emergency, specialty_bits,
+            tree, cos_lat, lat_deg, lon_deg, geoms, rtree, grid)
+
+
+class NearbyResult(Sequence):
+    """
+    Lazy sequence view over a radius-query result.
+
+    Holds only the matching hospital indices and distances; the per-row
+    dict copies (the expensive part of a query) are built on demand when
+    an element is accessed. A caller that only checks len() or reads the
+    first few rows never pays for the rest, while iteration, indexing,
+    slicing and sorted() behave exactly like the list this replaces.
+    """
+
+    __slots__ = ("_locator", "_indices", "_distances")
+
+    def __init__(self, locator: "VetLocator",
+                 indices: np.ndarray, distances: np.ndarray):
+        self._locator = locator
+        self._indices = indices
+        self._distances = distances
+
+    def __len__(self) -> int:
+        return len(self._indices)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self._locator._hospital_with_distance(i, d)
+                    for i, d in zip(self._indices[item],
+                                    self._distances[item])]
+        return self._locator._hospital_with_distance(
+            self._indices[item], self._distances[item])
+
+    def __iter__(self):
+        for i, d in zip(self._indices, self._distances):
+            yield self._locator._hospital_with_distance(i, d)
+
+    def __repr__(self) -> str:
+        return f"NearbyResult({len(self)} hospitals)"
+
+
 class VetLocator:
     """
     Veterinary hospital locator with filtering and sorting capabilities.
@@ -36,6 +341,20 @@ class VetLocator:
     MAX_SEARCH_RADIUS = 100  # Maximum search radius in km
     DEFAULT_SEARCH_RADIUS = 50  # Default search radius in km
     DEFAULT_MIN_RATING = 4.0  # Default minimum rating
+    REC_CACHE_MAX = 1024  # Max cached recommendation queries per instance
+    BASE_CACHE_MAX = 256  # Max cached filtered candidate sets per instance
+    EQUIRECT_MAX_RADIUS = 20  # Largest radius (km) for the flat-earth kernel
+
+    # Display template, compiled once at class load; format_hospital_info
+    # only fills in the slots
+    _EMERGENCY_BADGE = "🚨 24/7 Emergency"
+    _INFO_TEMPLATE = ("🏥 {name}\n"
+                      "   📍 Address: {address}\n"
+                      "   ⭐ Rating: {rating}/5.0\n"
+                      "   📞 Phone: {phone}\n"
+                      "   📏 Distance: {dist} km\n"
+                      "   {badge}\n"
+                      "   Specialties: {specialties}")
 
     def __init__(self, hospital_db_path: str = "data/vet_hospitals.json"):
         """
@@ -45,14 +364,207 @@ class VetLocator:
             hospital_db_path: Path to hospital JSON database
         """
         self.hospital_db_path = hospital_db_path
-        self.hospitals = self._load_hospitals()
+        (hospitals, self._lat, self._lon, self._ratings,
+         self._is_emergency, self._specialty_bits, self._tree,
+         self._cos_lat, self._lat_deg, self._lon_deg,
+         self._geoms, self._rtree, self._grid) = self._load_hospitals()
+        # Cheap per-instance list view over the shared cached tuple
+        # (public API and tests expect a list)
+        self.hospitals = list(hospitals)
+        # Recommendation caches; a new instance (i.e. a DB reload) always
+        # starts empty, so stale entries cannot survive a reload.
+        # _rec_cache holds final top-k answers; _base_cache holds the
+        # filtered candidate arrays shared by queries that differ only
+        # in sort order or result count
+        self._rec_cache = OrderedDict()
+        self._base_cache = OrderedDict()
+
+    def _bbox_prefilter(self, lat1: float, lon1: float, r_km: float,
+                        cos_lat1: float = None) -> np.ndarray:
+        """
+        Conservative equirectangular bounding box around the query point.
+
+        Two compares per row replace five transcendentals; the exact
+        Haversine then only runs on rows inside the box. The box is
+        padded a few percent so no hospital within r_km is ever culled
+        (a degree of latitude spans 110.57-111.69 km).
+
+        Returns:
+            Boolean mask over all hospitals
+        """
+        dlat_max = 1.05 * r_km / 111.32
+        if cos_lat1 is None:
+            cos_lat1 = math.cos(math.radians(lat1))
+        dlon_max = 1.10 * r_km / (111.32 * max(abs(cos_lat1), 1e-6))
+
+        return ((np.abs(self._lat_deg - lat1) < dlat_max) &
+                (np.abs(((self._lon_deg - lon1 + 180) % 360) - 180)
+                 < dlon_max))
+
+    def _haversine_bulk(
+            self,
+            user_location: Tuple[float, float],
+            indices: Optional[np.ndarray] = None,
+            lat1_rad: float = None,
+            lon1_rad: float = None
+    ) -> np.ndarray:
+        """
+        Compute distances from the user to many hospitals at once.
+
+        Args:
+            user_location: (latitude, longitude) in degrees
+            indices: Optional hospital index array; defaults to all
+            lat1_rad: Optional precomputed query latitude in radians
+            lon1_rad: Optional precomputed query longitude in radians
+
+        Returns:
+            Array of distances in kilometers, one per (selected) hospital
+        """
+        if indices is None:
+            lat, lon, cos_lat = self._lat, self._lon, self._cos_lat
+        else:
+            lat = self._lat[indices]
+            lon = self._lon[indices]
+            cos_lat = self._cos_lat[indices]
+
+        if lat1_rad is None:
+            lat1_rad = math.radians(user_location[0])
+            lon1_rad = math.radians(user_location[1])
+
+        if _chaversine is not None:
+            out = np.empty(len(lat), dtype=np.float32)
+            _chaversine.haversine_bulk(
+                np.ascontiguousarray(lat), np.ascontiguousarray(lon),
+                np.ascontiguousarray(cos_lat), lat1_rad, lon1_rad, out)
+            return out
+
+        lat1 = np.float32(lat1_rad)
+        lon1 = np.float32(lon1_rad)
+        cos1 = np.float32(math.cos(lat1_rad))
+
+        # Direct half-angle form: sin of a small delta keeps full
+        # relative precision in float32, whereas the 1 - cos(dlat)
+        # identity cancels catastrophically for nearby points. The
+        # hospital-side cos(lat) stays a precomputed load. Everything
+        # runs through in-place ufuncs over two float32 buffers, so
+        # NumPy's SIMD loops stream the minimum number of arrays.
+        a = np.subtract(lat, lat1)
+        a *= np.float32(0.5)
+        np.sin(a, out=a)
+        a *= a
+
+        b = np.subtract(lon, lon1)
+        b *= np.float32(0.5)
+        np.sin(b, out=b)
+        b *= b
+        b *= cos_lat
+        b *= cos1
+
+        a += b
+        # rounding can push a marginally past the valid [0, 1] range
+        np.clip(a, 0.0, 1.0, out=a)
+        np.sqrt(a, out=a)
+        np.arcsin(a, out=a)
+        a *= np.float32(2 * _R)
+        return a
+
+    def _equirect_bulk(
+            self,
+            indices: np.ndarray,
+            lat1_rad: float,
+            lon1_rad: float
+    ) -> np.ndarray:
+        """
+        Equirectangular-approximation distances for short ranges.
+
+        Projects each pair onto a flat plane at the midpoint latitude:
+        x = dlon * cos((lat1 + lat2) / 2), y = dlat, d = R * hypot(x, y).
+        One cos and one sqrt per hospital instead of haversine's four
+        sines and an arcsine; within ~20 km the error stays below a few
+        meters, far inside the rounding applied to reported distances.
+
+        Args:
+            indices: Hospital index array to evaluate
+            lat1_rad: Query latitude in radians
+            lon1_rad: Query longitude in radians
 
-    def _load_hospitals(self) -> List[Dict]:
+        Returns:
+            Array of approximate distances in kilometers
         """
-        Load hospital data from JSON file.
+        lat = self._lat[indices]
+        lon = self._lon[indices]
+
+        lat1 = np.float32(lat1_rad)
+        lon1 = np.float32(lon1_rad)
+
+        # Midpoint-latitude scale factor for the longitude axis
+        mid = np.add(lat, lat1)
+        mid *= np.float32(0.5)
+        np.cos(mid, out=mid)
+
+        x = np.subtract(lon, lon1)
+        # Wrap dlon into [-pi, pi] so pairs straddling the antimeridian
+        # measure the short way around
+        x += np.float32(math.pi)
+        np.mod(x, np.float32(2 * math.pi), out=x)
+        x -= np.float32(math.pi)
+        x *= mid
+
+        y = np.subtract(lat, lat1)
+
+        np.hypot(x, y, out=x)
+        x *= np.float32(_R)
+        return x
+
+    def _grid_candidates(self, lat1: float, lon1: float,
+                         r_km: float) -> np.ndarray:
+        """
+        Gather candidate hospital indices from the grid-hash index.
+
+        Visits every 0.05-degree cell whose extent could intersect the
+        search circle (the same 1.05x/1.10x padding as the bbox cull)
+        and concatenates their index lists. For short radii that is a
+        handful of O(1) dict lookups instead of a full-table mask, and
+        the result is a conservative superset the exact kernel refines.
+
+        Args:
+            lat1: Query latitude in degrees
+            lon1: Query longitude in degrees
+            r_km: Search radius in kilometers
+
+        Returns:
+            Array of candidate hospital indices (possibly empty)
+        """
+        span_lat = math.ceil(1.05 * r_km / (111.32 * _GRID_CELL_DEG))
+        cos_lat1 = max(abs(math.cos(math.radians(lat1))), 1e-6)
+        span_lon = math.ceil(
+            1.10 * r_km / (111.32 * cos_lat1 * _GRID_CELL_DEG))
+
+        cy = math.floor(lat1 / _GRID_CELL_DEG)
+        cx = math.floor(lon1 / _GRID_CELL_DEG)
+        # Longitude cells wrap at the antimeridian (360 / 0.05 = 7200)
+        n_lon = round(360 / _GRID_CELL_DEG)
+
+        hits = []
+        for dy in range(-span_lat, span_lat + 1):
+            for dx in range(-span_lon, span_lon + 1):
+                key = (cy + dy, (cx + dx + n_lon // 2) % n_lon - n_lon // 2)
+                cell = self._grid.get(key)
+                if cell is not None:
+                    hits.append(cell)
+
+        if not hits:
+            return np.empty(0, dtype=np.intp)
+        return np.concatenate(hits)
+
+    def _load_hospitals(self):
+        """
+        Load hospital data (and SoA arrays) through the module cache.
 
         Returns:
-            List of hospital dictionaries
+            The cached 13-element tuple from _load_db (hospital dicts,
+            SoA filter/coordinate arrays, and the optional spatial
+            indexes; see _load_db)
 
         Raises:
             FileNotFoundError: If database file not found
@@ -64,10 +576,7 @@ class VetLocator:
                 f"Hospital database not found at {self.hospital_db_path}"
             )
 
-        with open(db_path, 'r') as f:
-            data = json.load(f)
-
-        return data.get("hospitals", [])
+        return _load_db(str(db_path.resolve()), db_path.stat().st_mtime_ns)
 
     def calculate_distance(
             self,
@@ -95,43 +604,30 @@ class VetLocator:
         lat1, lon1 = location1
         lat2, lon2 = location2
 
-        # Convert to radians
-        lat1_rad = math.radians(lat1)
-        lat2_rad = math.radians(lat2)
-        delta_lat = math.radians(lat2 - lat1)
-        delta_lon = math.radians(lon2 - lon1)
-
-        # Haversine formula
-        a = (math.sin(delta_lat / 2) ** 2 +
-             math.cos(lat1_rad) * math.cos(lat2_rad) *
-             math.sin(delta_lon / 2) ** 2)
+        return round(_haversine_km(lat1, lon1, lat2, lon2), 2)
 
-        c = 2 * math.asin(math.sqrt(a))
-
-        distance = self.EARTH_RADIUS_KM * c
+    def _hospital_with_distance(self, index: int, distance: float) -> Dict:
+        """
+        Copy one hospital dict and attach its query distance.
 
-        return round(distance, 2)
+        Distances stay unrounded through filtering and sorting; the
+        2-decimal rounding happens only here, at display materialization.
+        """
+        hospital = self.hospitals[index].copy()
+        hospital["distance"] = round(float(distance), 2)
+        return hospital
 
-    def get_nearby_hospitals(
+    def _nearby_indices(
             self,
             user_location: Tuple[float, float],
             search_radius: float = None,
             min_rating: float = None,
             is_emergency: Optional[bool] = None,
             pet_type: Optional[str] = None
-    ) -> List[Dict]:
+    ) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Get list of hospitals within specified radius and criteria.
-
-        Args:
-            user_location: (latitude, longitude) of user
-            search_radius: Search radius in km (default: 50)
-            min_rating: Minimum hospital rating (default: 4.0)
-            is_emergency: Filter for 24/7 emergency service (optional)
-            pet_type: Filter by pet type specialization (optional)
-
-        Returns:
-            List of hospital dictionaries with distance added
+        Core radius query: validate, filter, and return matches as
+        (hospital indices, distances) arrays without building any dicts.
 
         Raises:
             ValueError: If location format is invalid or radius out of range
@@ -156,48 +652,180 @@ class VetLocator:
         if not (1.0 <= min_rating <= 5.0):
             raise ValueError("Rating must be between 1.0 and 5.0")
 
-        nearby_hospitals = []
+        # Convert the query point to radians exactly once per call;
+        # every downstream step reuses these values
+        lat1_rad = math.radians(user_location[0])
+        lon1_rad = math.radians(user_location[1])
+
+        # Resolve radius candidates: the BallTree prunes most hospitals
+        # before any distance math; otherwise one vectorized scan does it
+        if self._tree is not None:
+            query = np.array([[lat1_rad, lon1_rad]])
+            ind, dist = self._tree.query_radius(
+                query,
+                r=search_radius / _R,
+                return_distance=True,
+            )
+            candidates = ind[0]
+            distances = dist[0] * _R
+        else:
+            # Candidate cull first, then the distance kernel. Short
+            # radii read a block of grid cells (O(1) lookups) and use
+            # the flat-earth kernel; larger ones mask the whole table
+            # against a padded bounding box and use exact Haversine.
+            if search_radius <= self.EQUIRECT_MAX_RADIUS:
+                box = self._grid_candidates(
+                    user_location[0], user_location[1], search_radius)
+                box_distances = self._equirect_bulk(box, lat1_rad, lon1_rad)
+            else:
+                box = np.flatnonzero(self._bbox_prefilter(
+                    user_location[0], user_location[1], search_radius,
+                    cos_lat1=math.cos(lat1_rad)))
+                box_distances = self._haversine_bulk(
+                    user_location, box, lat1_rad=lat1_rad, lon1_rad=lon1_rad)
+            in_radius = box_distances <= search_radius
+            candidates = box[in_radius]
+            distances = box_distances[in_radius]
+
+        # Compare ratings in float32 so an exact threshold (e.g. 4.7)
+        # still matches a hospital stored with that same rating
+        keep = self._ratings[candidates] >= np.float32(min_rating)
+
+        if is_emergency is not None:
+            keep &= self._is_emergency[candidates] == is_emergency
+
+        if pet_type is not None:
+            # A hospital qualifies if it covers the species or is general
+            pet_mask = _PET_MASKS.get(pet_type)
+            if pet_mask is not None:
+                keep &= (self._specialty_bits[candidates] & pet_mask) != 0
+
+        return candidates[keep], distances[keep]
+
+    # Cap on query-rows x hospitals cells per broadcast chunk, keeping
+    # the (m, N) distance intermediate comfortably cache-sized
+    _BATCH_MAX_CELLS = 1_000_000
+
+    def get_nearby_hospitals_batch(
+            self,
+            user_locations,
+            search_radius: float = None,
+            min_rating: float = None,
+            is_emergency: Optional[bool] = None,
+            pet_type: Optional[str] = None
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Radius-query many user locations in one vectorized pass.
+
+        Streams the hospital arrays once per chunk of users via a
+        broadcasted (m, N) Haversine instead of re-running the scalar
+        query per user. Accepts the same filters as
+        get_nearby_hospitals so a caller can swap a loop over it for
+        one batch call.
 
-        for hospital in self.hospitals:
-            # Calculate distance
-            hospital_location = (
-                hospital["latitude"],
-                hospital["longitude"]
+        Args:
+            user_locations: Array-like of shape (M, 2) holding
+                (latitude, longitude) rows in degrees
+            search_radius: Search radius in km (default: 50)
+            min_rating: Minimum hospital rating (default: 4.0)
+            is_emergency: Filter for 24/7 emergency service (optional)
+            pet_type: Filter by pet type specialization (optional)
+
+        Returns:
+            List of M (hospital indices, distances in km) array pairs,
+            one per user
+
+        Raises:
+            ValueError: If the locations shape is invalid or radius
+                out of range
+        """
+        locations = np.asarray(user_locations, dtype=np.float64)
+        if locations.ndim != 2 or locations.shape[1] != 2:
+            raise ValueError(
+                "Locations must be an (M, 2) array of (latitude, longitude)"
             )
-            distance = self.calculate_distance(user_location, hospital_location)
 
-            # Check if within radius
-            if distance > search_radius:
-                continue
+        if search_radius is None:
+            search_radius = self.DEFAULT_SEARCH_RADIUS
+        if min_rating is None:
+            min_rating = self.DEFAULT_MIN_RATING
+
+        if not (1 <= search_radius <= self.MAX_SEARCH_RADIUS):
+            raise ValueError(
+                f"Search radius must be between 1 and {self.MAX_SEARCH_RADIUS} km"
+            )
+        if not (1.0 <= min_rating <= 5.0):
+            raise ValueError("Rating must be between 1.0 and 5.0")
 
-            # Check rating
-            if hospital["rating"] < min_rating:
-                continue
+        lat1 = np.deg2rad(locations[:, 0]).astype(np.float32)
+        lon1 = np.deg2rad(locations[:, 1]).astype(np.float32)
+        cos1 = np.cos(np.deg2rad(locations[:, 0])).astype(np.float32)
+
+        keep = self._ratings >= np.float32(min_rating)
+        if is_emergency is not None:
+            keep &= self._is_emergency == is_emergency
+        if pet_type is not None:
+            pet_mask = _PET_MASKS.get(pet_type)
+            if pet_mask is not None:
+                keep &= (self._specialty_bits & pet_mask) != 0
+
+        n_hospitals = max(len(self._lat), 1)
+        chunk = max(1, self._BATCH_MAX_CELLS // n_hospitals)
+
+        results = []
+        for start in range(0, len(locations), chunk):
+            end = start + chunk
+            # Same half-angle kernel as _haversine_bulk, broadcast
+            # to (m, N)
+            sin_half_dlat = np.sin(
+                (self._lat[None, :] - lat1[start:end, None]) / 2)
+            sin_half_dlon = np.sin(
+                (self._lon[None, :] - lon1[start:end, None]) / 2)
+
+            a = (sin_half_dlat ** 2 +
+                 cos1[start:end, None] * self._cos_lat[None, :] *
+                 sin_half_dlon ** 2)
+            np.clip(a, 0.0, 1.0, out=a)
+
+            distances = _R * 2 * np.arcsin(np.sqrt(a))
+            mask = (distances <= search_radius) & keep[None, :]
+
+            for row, row_distances in zip(mask, distances):
+                indices = np.flatnonzero(row)
+                results.append((indices, row_distances[indices]))
+
+        return results
 
-            # Check emergency service filter
-            if is_emergency is not None:
-                if hospital.get("is_emergency", False) != is_emergency:
-                    continue
+    def get_nearby_hospitals(
+            self,
+            user_location: Tuple[float, float],
+            search_radius: float = None,
+            min_rating: float = None,
+            is_emergency: Optional[bool] = None,
+            pet_type: Optional[str] = None
+    ) -> NearbyResult:
+        """
+        Get hospitals within specified radius and criteria.
 
-            # Check pet type specialization
-            if pet_type is not None:
-                specialties = hospital.get("specialties", [])
-                pet_specialties = [s.lower() for s in specialties]
+        Args:
+            user_location: (latitude, longitude) of user
+            search_radius: Search radius in km (default: 50)
+            min_rating: Minimum hospital rating (default: 4.0)
+            is_emergency: Filter for 24/7 emergency service (optional)
+            pet_type: Filter by pet type specialization (optional)
 
-                # Check if hospital handles this pet type
-                if pet_type == "dog" and "canine" not in pet_specialties:
-                    if "general" not in pet_specialties:
-                        continue
-                elif pet_type == "cat" and "feline" not in pet_specialties:
-                    if "general" not in pet_specialties:
-                        continue
+        Returns:
+            Lazy sequence of hospital dictionaries with distance added;
+            each dict copy is built only when accessed
 
-            # Add distance to hospital info
-            hospital_with_distance = hospital.copy()
-            hospital_with_distance["distance"] = distance
-            nearby_hospitals.append(hospital_with_distance)
+        Raises:
+            ValueError: If location format is invalid or radius out of range
+        """
+        indices, distances = self._nearby_indices(
+            user_location, search_radius, min_rating, is_emergency, pet_type
+        )
 
-        return nearby_hospitals
+        return NearbyResult(self, indices, distances)
 
     def sort_by_distance(self, hospitals: List[Dict]) -> List[Dict]:
         """
@@ -223,6 +851,32 @@ class VetLocator:
         """
         return sorted(hospitals, key=lambda h: h.get("rating", 0), reverse=True)
 
+    def filter_by_polygon(self, polygon) -> np.ndarray:
+        """
+        Get indices of hospitals inside a polygon (e.g. a state border).
+
+        Uses the STRtree for a bounding-box pass, then an exact
+        vectorized contains check on the candidates - both C-level
+        operations over the whole geometry array.
+
+        Args:
+            polygon: A shapely Polygon/MultiPolygon in lon/lat degrees
+
+        Returns:
+            Sorted array of hospital indices inside the polygon
+
+        Raises:
+            ImportError: If Shapely 2.x is not installed
+        """
+        if self._geoms is None:
+            raise ImportError(
+                "Polygon filtering requires Shapely 2.x (pip install shapely)"
+            )
+
+        candidates = self._rtree.query(polygon)
+        inside = shapely.contains(polygon, self._geoms[candidates])
+        return np.sort(candidates[inside])
+
     def filter_by_rating(self, hospitals: List[Dict], min_rating: float) -> List[Dict]:
         """
         Filter hospitals by minimum rating.
@@ -257,21 +911,62 @@ class VetLocator:
         Returns:
             List of top recommended hospitals
         """
-        # Get nearby hospitals
-        nearby = self.get_nearby_hospitals(
-            user_location,
-            search_radius,
-            min_rating
-        )
+        # Queries from (roughly) the same spot hit an LRU cache keyed by
+        # the location rounded to 3 decimals (~110 m); entries hold only
+        # (index, distance) pairs, so fresh dict copies are built per call
+        cache_key = None
+        if isinstance(user_location, tuple) and len(user_location) == 2:
+            cache_key = (
+                round(user_location[0], 3), round(user_location[1], 3),
+                search_radius, min_rating, max_results, sort_by,
+            )
+            cached = self._rec_cache.get(cache_key)
+            if cached is not None:
+                self._rec_cache.move_to_end(cache_key)
+                return [self._hospital_with_distance(i, d) for i, d in cached]
+
+        # The filtered candidate set depends only on location and
+        # filters, so queries varying max_results or sort_by share it
+        base_key = None
+        if cache_key is not None:
+            base_key = cache_key[:4]
+            base = self._base_cache.get(base_key)
+        else:
+            base = None
+
+        if base is not None:
+            self._base_cache.move_to_end(base_key)
+            indices, distances = base
+        else:
+            indices, distances = self._nearby_indices(
+                user_location, search_radius, min_rating
+            )
+            if base_key is not None:
+                self._base_cache[base_key] = (indices, distances)
+                if len(self._base_cache) > self.BASE_CACHE_MAX:
+                    self._base_cache.popitem(last=False)
 
-        # Sort based on preference
+        # Sort based on preference; when only k of n rows survive the
+        # cut, argpartition selects them in O(n) before the small sort
         if sort_by == "rating":
-            sorted_hospitals = self.sort_by_rating(nearby)
+            keys = -self._ratings[indices].astype(np.float64)
         else:  # default to distance
-            sorted_hospitals = self.sort_by_distance(nearby)
+            keys = distances
+
+        if 0 < max_results < len(keys):
+            part = np.argpartition(keys, max_results - 1)[:max_results]
+            order = part[np.argsort(keys[part], kind="stable")]
+        else:
+            order = np.argsort(keys, kind="stable")[:max_results]
 
-        # Return top results
-        return sorted_hospitals[:max_results]
+        top = [(int(indices[j]), float(distances[j])) for j in order]
+
+        if cache_key is not None:
+            self._rec_cache[cache_key] = tuple(top)
+            if len(self._rec_cache) > self.REC_CACHE_MAX:
+                self._rec_cache.popitem(last=False)
+
+        return [self._hospital_with_distance(i, d) for i, d in top]
 
     def format_hospital_info(self, hospital: Dict) -> str:
         """
@@ -283,19 +978,17 @@ class VetLocator:
         Returns:
             Formatted string with hospital details
         """
-        emergency_badge = "🚨 24/7 Emergency" if hospital.get("is_emergency") else ""
-
-        output = f"""
-🏥 {hospital['name']}
-   📍 Address: {hospital['address']}
-   ⭐ Rating: {hospital['rating']}/5.0
-   📞 Phone: {hospital['phone']}
-   📏 Distance: {hospital.get('distance', 'N/A')} km
-   {emergency_badge}
-   Specialties: {', '.join(hospital.get('specialties', []))}
-        """.strip()
-
-        return output
+        specialties = ", ".join(hospital.get("specialties", []))
+
+        return self._INFO_TEMPLATE.format(
+            name=hospital["name"],
+            address=hospital["address"],
+            rating=hospital["rating"],
+            phone=hospital["phone"],
+            dist=hospital.get("distance", "N/A"),
+            badge=self._EMERGENCY_BADGE if hospital.get("is_emergency") else "",
+            specialties=specialties,
+        )
 
 
 # Convenience function
@@ -0,0 +1,55 @@
+"""
+Shared pytest fixtures for the PetMate test suite.
+
+Author: PetMate Team
+Date: November 2025
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.ai_symptom_analyzer import SymptomCache
+from src.vet_locator import VetLocator
+
+
+@pytest.fixture(autouse=True)
+def _isolated_symptom_cache(tmp_path, monkeypatch):
+    """
+    Point the on-disk symptom cache at a per-test temp file.
+
+    Without this, any test that touches the analyzer writes real state
+    into ~/.petmate/cache.db, making runs stateful across machines.
+    """
+    monkeypatch.setattr(SymptomCache, "DB_PATH", tmp_path / "cache.db")
+
+
+@pytest.fixture(scope="session")
+def locator():
+    """
+    One shared VetLocator for the whole session.
+
+    The locator tests are read-only, so a single instance replaces the
+    per-test construction (and per-test database load) that
+    setup_method used to do.
+    """
+    return VetLocator()
+
+
+@pytest.fixture(scope="session")
+def boston_nearby(locator):
+    """
+    Shared radius-50 result set around Boston.
+
+    min_rating=1.0 makes it a superset every consumer can sort or
+    filter down; the underlying scan runs once per session instead of
+    once per test.
+    """
+    return locator.get_nearby_hospitals(
+        (42.3601, -71.0589), search_radius=50, min_rating=1.0
+    )
@@ -7,15 +7,18 @@ Author: PetMate Team
 Date: November 2025
 """
 
+import asyncio
 import pytest
 import sys
+import time
 from pathlib import Path
 
 # Add project root to path for imports
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from src.ai_symptom_analyzer import AISymptomAnalyzer, analyze_pet_symptoms
+from src.ai_symptom_analyzer import (AISymptomAnalyzer, SymptomCache,
+                                     analyze_pet_symptoms)
 from src.config import Config
 
 
@@ -178,6 +181,84 @@ class TestAISymptomAnalyzer:
             assert stats["mode"] == "mock"
 
 
+class TestSymptomCachePersistence:
+    """Test suite for the SQLite layer behind SymptomCache.
+
+    Each test writes through one cache instance and reads through a
+    fresh one: the conftest fixture points DB_PATH at a per-test temp
+    file, so a second instance models a process restart.
+    """
+
+    def setup_method(self):
+        """Skip the class when caching is disabled."""
+        if not Config.ENABLE_CACHE:
+            pytest.skip("Cache disabled in config")
+
+    def test_entries_survive_restart(self):
+        """Test that a cached result is served by a fresh instance."""
+        value = {"condition_name": "Sneezing", "mode": "mock"}
+        SymptomCache().set("mock:dog:sneezing", value)
+
+        restarted = SymptomCache()
+        assert restarted.get("mock:dog:sneezing") == value
+
+    def test_modes_never_cross(self):
+        """Test that a persisted mock entry cannot answer a real key."""
+        value = {"condition_name": "Sneezing", "mode": "mock"}
+        SymptomCache().set("mock:dog:sneezing", value)
+
+        restarted = SymptomCache()
+        assert restarted.get("real:dog:sneezing") is None
+
+    def test_expired_rows_purged_on_open(self):
+        """Test that opening the database deletes expired rows."""
+        stale = SymptomCache()
+        stale._disk_set("mock:dog:old", {"condition_name": "Old"},
+                        time.time() - 10)
+
+        restarted = SymptomCache()
+        count = restarted._get_db().execute(
+            "SELECT COUNT(*) FROM cache").fetchone()[0]
+        assert count == 0
+
+
+class TestBatchAnalysis:
+    """Test suite for the concurrent batch API."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.analyzer = AISymptomAnalyzer()
+
+    def test_batch_matches_single_analysis(self):
+        """Test that batch results equal per-item analysis, in order."""
+        if not Config.USE_MOCK_AI:
+            pytest.skip("Batch parity test runs in mock mode")
+
+        items = [
+            ("My dog is vomiting", "dog"),
+            ("Cat is limping on back leg", "cat"),
+            ("My pet has been coughing", "dog"),
+        ]
+
+        # Pre-cache the first item so the batch exercises the
+        # cache-hit partition alongside the mock path
+        precached = self.analyzer.analyze_symptoms(items[0][0], items[0][1])
+
+        results = asyncio.run(self.analyzer.analyze_symptoms_batch(items))
+
+        assert len(results) == len(items)
+        assert results[0] == precached
+        for (text, pet_type), result in zip(items, results):
+            assert result == self.analyzer.analyze_symptoms(text, pet_type)
+
+    def test_batch_empty_text_raises(self):
+        """Test that an empty item fails the whole batch up front."""
+        with pytest.raises(ValueError, match="cannot be empty"):
+            asyncio.run(self.analyzer.analyze_symptoms_batch(
+                [("My dog is vomiting", "dog"), ("   ", "cat")]
+            ))
+
+
 class TestConvenienceFunction:
     """Test the convenience function."""
 
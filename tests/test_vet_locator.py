@@ -7,27 +7,35 @@ Author: PetMate Team
 Date: November 2025
 """
 
+import json
+import math
+import os
 import pytest
 import sys
 from pathlib import Path
 
+import numpy as np
+
 # Add project root to path for imports
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from src import vet_locator as vet_locator_module
 from src.vet_locator import VetLocator, find_nearby_vets
 
 
 class TestVetLocator:
     """Test suite for VetLocator class."""
 
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.locator = VetLocator()
-        # Boston location for testing
-        self.boston_location = (42.3601, -71.0589)
-        # Cambridge location for testing
-        self.cambridge_location = (42.3736, -71.1097)
+    # Boston location for testing
+    boston_location = (42.3601, -71.0589)
+    # Cambridge location for testing
+    cambridge_location = (42.3736, -71.1097)
+
+    @pytest.fixture(autouse=True)
+    def _attach_locator(self, locator):
+        """Share the session locator; these tests only read from it."""
+        self.locator = locator
 
     def test_initialization(self):
         """Test that VetLocator initializes correctly."""
@@ -60,7 +68,9 @@ class TestVetLocator:
             self.boston_location
         )
 
-        assert distance == 0.0
+        # Tolerance instead of exact equality so fastmath/FMA kernels
+        # (which may re-associate operations) remain valid
+        assert distance == pytest.approx(0.0, abs=1e-9)
 
     def test_calculate_distance_different_locations(self):
         """Test distance calculation between Boston and Cambridge."""
@@ -86,7 +96,136 @@ class TestVetLocator:
             self.boston_location
         )
 
-        assert distance1 == distance2
+        assert distance1 == pytest.approx(distance2, rel=1e-12)
+
+    def test_bulk_distances_match_scalar(self):
+        """Test that the vectorized kernel agrees with calculate_distance."""
+        distances = self.locator._haversine_bulk(self.boston_location)
+
+        assert len(distances) == len(self.locator.hospitals)
+
+        for hospital, bulk_distance in zip(self.locator.hospitals, distances):
+            scalar_distance = self.locator.calculate_distance(
+                self.boston_location,
+                (hospital["latitude"], hospital["longitude"])
+            )
+            # float32 bulk path vs rounded float64 scalar path
+            assert bulk_distance == pytest.approx(scalar_distance, abs=0.01)
+
+    def test_batch_matches_single_queries(self):
+        """Test that the batch API agrees with per-user queries."""
+        locations = [self.boston_location, self.cambridge_location,
+                     (40.7128, -74.0060)]
+
+        for kwargs in ({"min_rating": 1.0},
+                       {"min_rating": 1.0, "is_emergency": True},
+                       {"min_rating": 1.0, "pet_type": "cat"}):
+            batch = self.locator.get_nearby_hospitals_batch(
+                np.array(locations), search_radius=50, **kwargs)
+            assert len(batch) == len(locations)
+
+            for location, (indices, distances) in zip(locations, batch):
+                single_idx, single_dist = self.locator._nearby_indices(
+                    location, search_radius=50, **kwargs)
+
+                assert set(indices.tolist()) == set(single_idx.tolist())
+                # float32 broadcast kernel vs the per-query path
+                by_idx = dict(zip(single_idx.tolist(), single_dist.tolist()))
+                for i, d in zip(indices.tolist(), distances.tolist()):
+                    assert d == pytest.approx(by_idx[i], abs=0.01)
+
+    @pytest.mark.skipif(vet_locator_module.shapely is None,
+                        reason="Shapely 2.x not installed")
+    def test_filter_by_polygon_matches_bounds_check(self):
+        """Test STRtree polygon filtering against a direct bounds scan."""
+        shapely = vet_locator_module.shapely
+        # Rectangle around the Boston cluster, in (lon, lat) order to
+        # match the stored point geometries
+        polygon = shapely.box(-71.2, 42.2, -70.9, 42.5)
+
+        inside = self.locator.filter_by_polygon(polygon)
+
+        lon = self.locator._lon_deg
+        lat = self.locator._lat_deg
+        expected = np.flatnonzero(
+            (lon >= -71.2) & (lon <= -70.9) & (lat >= 42.2) & (lat <= 42.5))
+
+        assert len(inside) > 0
+        np.testing.assert_array_equal(inside, expected)
+
+    def test_results_are_json_serializable(self, boston_nearby):
+        """Test that query results stay plain JSON-serializable records."""
+        serialized = json.loads(json.dumps(list(boston_nearby)))
+
+        assert len(serialized) == len(boston_nearby)
+        # No internal derived fields may leak into public results
+        for hospital in serialized:
+            assert not any(key.startswith("_") for key in hospital)
+
+    def test_equirectangular_matches_haversine_short_range(self):
+        """Test the flat-earth kernel against haversine inside its cap."""
+        distances = self.locator._haversine_bulk(self.boston_location)
+        near = np.flatnonzero(distances <= self.locator.EQUIRECT_MAX_RADIUS)
+        assert len(near) > 0
+
+        approx = self.locator._equirect_bulk(
+            near,
+            math.radians(self.boston_location[0]),
+            math.radians(self.boston_location[1]),
+        )
+
+        # Within 20 km the projection error is a few meters at most
+        assert np.all(np.abs(approx - distances[near]) < 0.01)
+
+    def test_grid_candidates_cover_radius(self):
+        """Test that the grid hash never drops an in-radius hospital."""
+        distances = self.locator._haversine_bulk(self.boston_location)
+        for radius in (1, 5, 10, 20):
+            in_radius = set(np.flatnonzero(distances <= radius).tolist())
+            candidates = set(self.locator._grid_candidates(
+                self.boston_location[0], self.boston_location[1], radius
+            ).tolist())
+            # Every hospital within the radius must be in the cell block
+            assert in_radius <= candidates
+
+    def test_bbox_prefilter_keeps_all_in_radius(self):
+        """Test that the bounding-box cull never drops in-radius hospitals."""
+        for radius in (1, 5, 20, 50, 100):
+            distances = self.locator._haversine_bulk(self.boston_location)
+            box = self.locator._bbox_prefilter(
+                self.boston_location[0], self.boston_location[1], radius
+            )
+
+            in_radius = distances <= radius
+            # Every hospital within the radius must survive the cull
+            assert not np.any(in_radius & ~box)
+
+    @pytest.mark.skipif(vet_locator_module.BallTree is None,
+                        reason="scikit-learn not installed")
+    def test_tree_and_brute_force_agree(self, monkeypatch):
+        """Test that the BallTree path matches the vectorized fallback."""
+        tree_results = self.locator.get_nearby_hospitals(
+            self.boston_location, search_radius=50, min_rating=1.0
+        )
+
+        # Rebuild without the tree so the brute-force path runs
+        monkeypatch.setattr(vet_locator_module, "BallTree", None)
+        vet_locator_module._load_db.cache_clear()
+        try:
+            brute_locator = VetLocator()
+            brute_results = brute_locator.get_nearby_hospitals(
+                self.boston_location, search_radius=50, min_rating=1.0
+            )
+        finally:
+            vet_locator_module._load_db.cache_clear()
+
+        tree_by_id = {h["hospital_id"]: h["distance"] for h in tree_results}
+        brute_by_id = {h["hospital_id"]: h["distance"] for h in brute_results}
+
+        assert set(tree_by_id) == set(brute_by_id)
+        for hospital_id, distance in tree_by_id.items():
+            assert distance == pytest.approx(brute_by_id[hospital_id],
+                                             abs=0.01)
 
     def test_get_nearby_hospitals_basic(self):
         """Test basic nearby hospital search."""
@@ -96,7 +235,9 @@ class TestVetLocator:
             min_rating=4.0
         )
 
-        assert isinstance(nearby, list)
+        # Results come back as a lazy sequence; it still supports len(),
+        # indexing and iteration like the list it replaced
+        assert isinstance(nearby, vet_locator_module.NearbyResult)
         assert len(nearby) > 0
 
         # All results should have distance field
@@ -208,48 +349,32 @@ class TestVetLocator:
                 min_rating=6.0
             )
 
-    def test_sort_by_distance(self):
+    def test_sort_by_distance(self, boston_nearby):
         """Test sorting hospitals by distance."""
-        nearby = self.locator.get_nearby_hospitals(
-            self.boston_location,
-            search_radius=50
-        )
-
-        sorted_hospitals = self.locator.sort_by_distance(nearby)
+        sorted_hospitals = self.locator.sort_by_distance(boston_nearby)
 
-        # Check that list is sorted
-        for i in range(len(sorted_hospitals) - 1):
-            assert sorted_hospitals[i]["distance"] <= sorted_hospitals[i + 1]["distance"]
+        # Check that list is sorted: one vectorized pairwise comparison
+        dists = np.array([h["distance"] for h in sorted_hospitals])
+        assert np.all(np.diff(dists) >= 0)
 
-    def test_sort_by_rating(self):
+    def test_sort_by_rating(self, boston_nearby):
         """Test sorting hospitals by rating."""
-        nearby = self.locator.get_nearby_hospitals(
-            self.boston_location,
-            search_radius=50
-        )
-
-        sorted_hospitals = self.locator.sort_by_rating(nearby)
+        sorted_hospitals = self.locator.sort_by_rating(boston_nearby)
 
         # Check that list is sorted (descending)
-        for i in range(len(sorted_hospitals) - 1):
-            assert sorted_hospitals[i]["rating"] >= sorted_hospitals[i + 1]["rating"]
+        ratings = np.array([h["rating"] for h in sorted_hospitals])
+        assert np.all(np.diff(ratings) <= 0)
 
-    def test_filter_by_rating(self):
+    def test_filter_by_rating(self, boston_nearby):
         """Test filtering hospitals by rating."""
-        nearby = self.locator.get_nearby_hospitals(
-            self.boston_location,
-            search_radius=50,
-            min_rating=1.0
-        )
-
-        filtered = self.locator.filter_by_rating(nearby, 4.5)
+        filtered = self.locator.filter_by_rating(boston_nearby, 4.5)
 
         # All filtered hospitals should meet rating
         for hospital in filtered:
             assert hospital["rating"] >= 4.5
 
         # Should have fewer or equal hospitals
-        assert len(filtered) <= len(nearby)
+        assert len(filtered) <= len(boston_nearby)
 
     def test_get_recommendations_default(self):
         """Test getting recommendations with default parameters."""
@@ -261,8 +386,8 @@ class TestVetLocator:
         assert len(recommendations) <= 5  # Default max_results
 
         # Should be sorted by distance (default)
-        for i in range(len(recommendations) - 1):
-            assert recommendations[i]["distance"] <= recommendations[i + 1]["distance"]
+        dists = np.array([h["distance"] for h in recommendations])
+        assert np.all(np.diff(dists) >= 0)
 
     def test_get_recommendations_sort_by_rating(self):
         """Test recommendations sorted by rating."""
@@ -272,8 +397,8 @@ class TestVetLocator:
         )
 
         # Should be sorted by rating (descending)
-        for i in range(len(recommendations) - 1):
-            assert recommendations[i]["rating"] >= recommendations[i + 1]["rating"]
+        ratings = np.array([h["rating"] for h in recommendations])
+        assert np.all(np.diff(ratings) <= 0)
 
     def test_get_recommendations_max_results(self):
         """Test max_results parameter."""
@@ -294,15 +419,32 @@ class TestVetLocator:
         # Should have more or equal results
         assert len(top_10) >= len(top_3)
 
-    def test_format_hospital_info(self):
-        """Test hospital information formatting."""
+    def test_recommendations_match_full_sort(self):
+        """Test that top-k selection agrees with a full sort and slice."""
         nearby = self.locator.get_nearby_hospitals(
-            self.boston_location,
-            search_radius=50
+            self.boston_location, search_radius=50, min_rating=4.0
+        )
+
+        by_distance = self.locator.get_recommendations(
+            self.boston_location, 50, 4.0, max_results=3
+        )
+        expected = self.locator.sort_by_distance(nearby)[:3]
+        assert ([h["hospital_id"] for h in by_distance] ==
+                [h["hospital_id"] for h in expected])
+
+        # Rating ties may order differently, so compare the key values
+        by_rating = self.locator.get_recommendations(
+            self.boston_location, 50, 4.0, max_results=3, sort_by="rating"
         )
+        expected_ratings = [
+            h["rating"] for h in self.locator.sort_by_rating(nearby)[:3]
+        ]
+        assert [h["rating"] for h in by_rating] == expected_ratings
 
-        if nearby:
-            hospital = nearby[0]
+    def test_format_hospital_info(self, boston_nearby):
+        """Test hospital information formatting."""
+        if boston_nearby:
+            hospital = boston_nearby[0]
             formatted = self.locator.format_hospital_info(hospital)
 
             # Check that key information is included
@@ -322,9 +464,10 @@ class TestVetLocator:
             min_rating=4.0
         )
 
-        # Should return empty list, not error
-        assert isinstance(nearby, list)
+        # Should return an empty result, not error
+        assert isinstance(nearby, vet_locator_module.NearbyResult)
         assert len(nearby) == 0
+        assert list(nearby) == []
 
 
 class TestConvenienceFunction:
@@ -344,30 +487,27 @@ class TestConvenienceFunction:
 class TestDataQuality:
     """Test data quality in hospital database."""
 
-    def test_all_hospitals_have_coordinates(self):
+    def test_all_hospitals_have_coordinates(self, locator):
         """Test that all hospitals have valid coordinates."""
-        locator = VetLocator()
-
-        for hospital in locator.hospitals:
-            assert "latitude" in hospital
-            assert "longitude" in hospital
+        # KeyError here means a hospital is missing a coordinate field
+        lats = np.fromiter(
+            (h["latitude"] for h in locator.hospitals), dtype=np.float64)
+        lons = np.fromiter(
+            (h["longitude"] for h in locator.hospitals), dtype=np.float64)
 
-            # Boston area coordinates (rough bounds)
-            assert 41 <= hospital["latitude"] <= 43
-            assert -72 <= hospital["longitude"] <= -70
+        # Boston area coordinates (rough bounds), checked in one pass
+        assert np.all((lats >= 41) & (lats <= 43))
+        assert np.all((lons >= -72) & (lons <= -70))
 
-    def test_all_hospitals_have_ratings(self):
+    def test_all_hospitals_have_ratings(self, locator):
         """Test that all hospitals have valid ratings."""
-        locator = VetLocator()
+        ratings = np.fromiter(
+            (h["rating"] for h in locator.hospitals), dtype=np.float64)
 
-        for hospital in locator.hospitals:
-            assert "rating" in hospital
-            assert 1.0 <= hospital["rating"] <= 5.0
+        assert np.all((ratings >= 1.0) & (ratings <= 5.0))
 
-    def test_all_hospitals_have_contact_info(self):
+    def test_all_hospitals_have_contact_info(self, locator):
         """Test that all hospitals have contact information."""
-        locator = VetLocator()
-
         for hospital in locator.hospitals:
             assert "phone" in hospital
             assert len(hospital["phone"]) > 0
@@ -375,10 +515,18 @@ class TestDataQuality:
             assert "address" in hospital
             assert len(hospital["address"]) > 0
 
-    def test_specialties_format(self):
-        """Test that specialties are properly formatted."""
-        locator = VetLocator()
+    def test_attribute_arrays_match_hospital_dicts(self, locator):
+        """Test that the SoA filter arrays stay aligned with the dicts."""
+        assert len(locator._ratings) == len(locator.hospitals)
+        assert len(locator._is_emergency) == len(locator.hospitals)
+
+        for i, hospital in enumerate(locator.hospitals):
+            assert locator._ratings[i] == pytest.approx(hospital["rating"])
+            assert (bool(locator._is_emergency[i]) ==
+                    hospital.get("is_emergency", False))
 
+    def test_specialties_format(self, locator):
+        """Test that specialties are properly formatted."""
         for hospital in locator.hospitals:
             if "specialties" in hospital:
                 assert isinstance(hospital["specialties"], list)
@@ -390,6 +538,61 @@ class TestDataQuality:
                        "feline" in specialties_lower
 
 
+class TestArrayCache:
+    """Test suite for the on-disk .npz SoA array cache."""
+
+    @pytest.fixture
+    def tmp_db(self, tmp_path):
+        """Copy of the hospital database in a writable temp directory."""
+        source = project_root / "data" / "vet_hospitals.json"
+        db_path = tmp_path / "vet_hospitals.json"
+        db_path.write_bytes(source.read_bytes())
+        return db_path
+
+    def test_cache_written_and_reused(self, tmp_db, locator):
+        """Test that a cold load writes the .npz and a warm load matches."""
+        cold = VetLocator(str(tmp_db))
+        cache_path = tmp_db.with_suffix(".cache.npz")
+        assert cache_path.exists()
+
+        # Force a reload that can only see the frozen arrays
+        vet_locator_module._load_db.cache_clear()
+        warm = VetLocator(str(tmp_db))
+        vet_locator_module._load_db.cache_clear()
+
+        np.testing.assert_array_equal(warm._lat, cold._lat)
+        np.testing.assert_array_equal(warm._lon, cold._lon)
+        np.testing.assert_array_equal(warm._ratings, locator._ratings)
+        np.testing.assert_array_equal(warm._specialty_bits,
+                                      locator._specialty_bits)
+
+    def test_corrupt_cache_falls_back_to_rebuild(self, tmp_db, locator):
+        """Test that an unreadable cache is ignored, not fatal."""
+        cache_path = tmp_db.with_suffix(".cache.npz")
+        cache_path.write_bytes(b"not an npz archive")
+
+        vet_locator_module._load_db.cache_clear()
+        rebuilt = VetLocator(str(tmp_db))
+        vet_locator_module._load_db.cache_clear()
+
+        np.testing.assert_array_equal(rebuilt._ratings, locator._ratings)
+
+    def test_stale_cache_is_regenerated(self, tmp_db):
+        """Test that touching the JSON invalidates the frozen arrays."""
+        VetLocator(str(tmp_db))
+        cache_path = tmp_db.with_suffix(".cache.npz")
+        stale_mtime = cache_path.stat().st_mtime_ns
+
+        # Make the JSON strictly newer than its cache
+        os.utime(tmp_db, ns=(stale_mtime + 10, stale_mtime + 10))
+
+        vet_locator_module._load_db.cache_clear()
+        VetLocator(str(tmp_db))
+        vet_locator_module._load_db.cache_clear()
+
+        assert cache_path.stat().st_mtime_ns > stale_mtime
+
+
 # Run tests with pytest
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file